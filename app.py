@@ -1,9 +1,22 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import Depends, FastAPI, File, Header, UploadFile, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, List
+import asyncio
+import hashlib
+import logging
 import os
+import re
 import shutil
-from lanchain_chotbot import RAGServiceModern
+import threading
+import time
+import aiofiles
+from cachetools import TTLCache
+from sentence_transformers import CrossEncoder
+from lanchain_chotbot import RAGServiceModern, build_embeddings, unload_ollama_model
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="RAG ChatBot API",
@@ -11,13 +24,140 @@ app = FastAPI(
 )
 
 
-rag_service = RAGServiceModern(vector_db_path="vector_db")
-
+VECTOR_DB_DIR = "vector_db"
 UPLOAD_DIR = "uploaded_pdfs"
+UPLOAD_CHUNK_SIZE = 1 << 20
 if not os.path.exists(UPLOAD_DIR):
     os.makedirs(UPLOAD_DIR)
 
-current_pdf_path: Optional[str] = None
+DEFAULT_SESSION_ID = "default"
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Model weights are shared by every session; only the index and chat state are per session.
+EMBED_MODEL = build_embeddings(os.path.join(VECTOR_DB_DIR, RAGServiceModern.EMBED_CACHE_DIR))
+RERANKER = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
+
+SESSION_TTL = 3600
+SESSIONS_DIR = os.path.join(VECTOR_DB_DIR, "sessions")
+
+
+class SessionCache(TTLCache):
+    """TTLCache that keeps the sessions it evicts so they can be cleaned up outside the lock."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.evicted: List[tuple] = []
+
+    def popitem(self):
+        # Capacity evictions may hit recently active sessions, so their files are kept for resuming.
+        key, value = super().popitem()
+        self.evicted.append((key, value, False))
+        return key, value
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        self.evicted.extend((key, value, True) for key, value in expired)
+        return expired
+
+
+SESSIONS = SessionCache(maxsize=64, ttl=SESSION_TTL)
+SESSIONS_LOCK = threading.Lock()
+SESSION_GUARDS: Dict[str, threading.Lock] = {}
+
+
+def session_guard(session_id: str) -> threading.Lock:
+    # Serializes loading and deleting one session's files without blocking other sessions.
+    with SESSIONS_LOCK:
+        return SESSION_GUARDS.setdefault(session_id, threading.Lock())
+
+
+def remove_session_files(session_id: str):
+    with session_guard(session_id):
+        with SESSIONS_LOCK:
+            if session_id in SESSIONS:
+                return
+        shutil.rmtree(os.path.join(SESSIONS_DIR, session_id), ignore_errors=True)
+        shutil.rmtree(os.path.join(UPLOAD_DIR, session_id), ignore_errors=True)
+
+
+def sweep_stale_sessions():
+    # Files of sessions that are no longer cached are kept until they have been idle for a full TTL.
+    if not os.path.exists(SESSIONS_DIR):
+        return
+    cutoff = time.time() - SESSION_TTL
+    for session_id in os.listdir(SESSIONS_DIR):
+        try:
+            idle = os.path.getmtime(os.path.join(SESSIONS_DIR, session_id)) < cutoff
+        except OSError:
+            continue
+        if idle:
+            remove_session_files(session_id)
+
+
+def touch_session(session_id: str):
+    # The sweep judges idleness by directory mtime, which uploads alone would not keep fresh.
+    try:
+        os.utime(os.path.join(SESSIONS_DIR, session_id))
+    except OSError:
+        pass
+
+
+def get_session(session_id: str) -> RAGServiceModern:
+    with SESSIONS_LOCK:
+        service = SESSIONS.get(session_id)
+        if service is not None:
+            # TTLCache counts from insertion; re-inserting keeps active sessions alive.
+            SESSIONS[session_id] = service
+        evicted, SESSIONS.evicted = SESSIONS.evicted, []
+
+    for evicted_id, evicted_service, expired in evicted:
+        evicted_service.release_resources()
+        if expired:
+            remove_session_files(evicted_id)
+    if evicted:
+        sweep_stale_sessions()
+
+    if service is not None:
+        touch_session(session_id)
+        return service
+
+    # Build and load outside the global lock so a slow index load does not stall other sessions.
+    with session_guard(session_id):
+        with SESSIONS_LOCK:
+            existing = SESSIONS.get(session_id)
+        if existing is not None:
+            return existing
+
+        vector_db_path = os.path.join(SESSIONS_DIR, session_id)
+        service = RAGServiceModern(
+            vector_db_path=vector_db_path,
+            embeddings=EMBED_MODEL,
+            reranker=RERANKER
+        )
+        # Sessions evicted for capacity, or from a previous server run, pick their index back up from disk.
+        if os.path.exists(os.path.join(vector_db_path, "index.faiss")):
+            service.load_existing_vectorstore()
+
+        with SESSIONS_LOCK:
+            SESSIONS[session_id] = service
+        touch_session(session_id)
+    return service
+
+
+def get_session_id(
+    x_session_id: str = Header(DEFAULT_SESSION_ID, description="Client session identifier")
+) -> str:
+
+    if not SESSION_ID_PATTERN.match(x_session_id):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid X-Session-Id header. Use 1-64 letters, digits, '-' or '_'."
+        )
+    return x_session_id
+
+
+def get_rag_service(session_id: str = Depends(get_session_id)) -> RAGServiceModern:
+    return get_session(session_id)
 
 
 class QuestionRequest(BaseModel):
@@ -31,20 +171,6 @@ class QuestionRequest(BaseModel):
         }
 
 
-class QuestionResponse(BaseModel):
-    status: str
-    question: str
-    answer: str
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "status": "success",
-                "question": "What is the main topic of this document?",
-                "answer": "The document discusses..."
-            }
-        }
-
 class MessageResponse(BaseModel):
     status: str
     message: str
@@ -74,6 +200,27 @@ class HealthResponse(BaseModel):
     service: str
 
 
+@app.on_event("startup")
+async def warmup():
+    await asyncio.get_running_loop().run_in_executor(None, sweep_stale_sessions)
+    result = await asyncio.get_running_loop().run_in_executor(None, lambda: get_session(DEFAULT_SESSION_ID).warmup())
+    if result["status"] != "success":
+        logger.warning(result["message"])
+
+
+@app.on_event("shutdown")
+async def release_resources():
+    with SESSIONS_LOCK:
+        services = list(SESSIONS.values())
+    for service in services:
+        await asyncio.get_running_loop().run_in_executor(None, service.release_resources)
+    
+    # Unload even when every session has expired; the model may still be resident from warm-up.
+    result = await asyncio.get_running_loop().run_in_executor(None, unload_ollama_model)
+    if result["status"] != "success":
+        logger.warning(result["message"])
+
+
 @app.get("/", response_model=dict)
 async def root():
     """
@@ -103,30 +250,36 @@ async def health_check():
 
 
 @app.post("/upload-pdf", response_model=MessageResponse)
-async def upload_pdf(file: UploadFile = File(..., description="PDF file to upload and process")):
+async def upload_pdf(
+    file: UploadFile = File(..., description="PDF file to upload and process"),
+    session_id: str = Depends(get_session_id),
+    rag_service: RAGServiceModern = Depends(get_rag_service)
+):
 
-    global current_pdf_path
-    
     if not file.filename.endswith('.pdf'):
         raise HTTPException(
             status_code=400, 
             detail="Only PDF files are allowed. Please upload a .pdf file."
         )
 
+    session_upload_dir = os.path.join(UPLOAD_DIR, session_id)
+    os.makedirs(session_upload_dir, exist_ok=True)
+    file_path = os.path.join(session_upload_dir, os.path.basename(file.filename))
+
     try:
-        file_path = os.path.join(UPLOAD_DIR, file.filename)
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        file_hash = hashlib.blake2b()
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_hash.update(chunk)
+                await buffer.write(chunk)
         
-        current_pdf_path = file_path
-        
-        result = rag_service.process_pdf(file_path)
+        result = await asyncio.get_running_loop().run_in_executor(
+            None, rag_service.process_pdf, file_path, file_hash.hexdigest()
+        )
         
         if result["status"] == "error":
             if os.path.exists(file_path):
                 os.remove(file_path)
-            current_pdf_path = None
             raise HTTPException(status_code=500, detail=result["message"])
         
         return MessageResponse(
@@ -137,16 +290,18 @@ async def upload_pdf(file: UploadFile = File(..., description="PDF file to uploa
     except HTTPException:
         raise
     except Exception as e:
-        if current_pdf_path and os.path.exists(current_pdf_path):
-            os.remove(current_pdf_path)
-        current_pdf_path = None
+        if os.path.exists(file_path):
+            os.remove(file_path)
         raise HTTPException(status_code=500, detail=f"Error uploading PDF: {str(e)}")
     finally:
         await file.close()
 
 
-@app.post("/ask", response_model=QuestionResponse)
-async def ask_question(request: QuestionRequest):
+@app.post("/ask", response_class=StreamingResponse)
+async def ask_question(
+    request: QuestionRequest,
+    rag_service: RAGServiceModern = Depends(get_rag_service)
+):
 
     if not request.question or request.question.strip() == "":
         raise HTTPException(
@@ -154,20 +309,18 @@ async def ask_question(request: QuestionRequest):
             detail="Question cannot be empty"
         )
     
-    result = rag_service.ask_question(request.question)
-    
-    if result["status"] == "error":
-        raise HTTPException(status_code=400, detail=result["message"])
+    if not rag_service.get_status()["qa_chain_ready"]:
+        raise HTTPException(status_code=400, detail="Please upload and process a PDF first")
     
-    return QuestionResponse(
-        status=result["status"],
-        question=result["question"],
-        answer=result["answer"]
+    return StreamingResponse(
+        rag_service.astream_question(request.question),
+        media_type="text/plain; charset=utf-8",
+        background=BackgroundTask(rag_service.compact_history)
     )
 
 
 @app.get("/chat-history", response_model=ChatHistoryResponse)
-async def get_chat_history():
+async def get_chat_history(rag_service: RAGServiceModern = Depends(get_rag_service)):
 
 
     try:
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+import numpy as np
+import onnxruntime as ort
+from langchain_core.embeddings import Embeddings
+from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer
+
+
+class ONNXEmbeddings(Embeddings):
+    """Sentence-transformers model served through an int8-quantized ONNX Runtime session."""
+
+    QUANTIZED_FILE = "model_quantized.onnx"
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        cache_dir: str = "onnx_models",
+        batch_size: int = 128,
+        max_length: int = 256,
+        normalize_embeddings: bool = True,
+        num_threads: Optional[int] = None
+    ):
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.normalize_embeddings = normalize_embeddings
+
+        model_dir = os.path.join(cache_dir, model_name.replace("/", "__"))
+        if not os.path.exists(os.path.join(model_dir, self.QUANTIZED_FILE)):
+            self._export(model_name, model_dir)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        session_options = ort.SessionOptions()
+        session_options.intra_op_num_threads = num_threads or os.cpu_count() or 1
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, self.QUANTIZED_FILE),
+            sess_options=session_options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    @staticmethod
+    def _export(model_name: str, model_dir: str):
+        model = ORTModelForFeatureExtraction.from_pretrained(
+            model_name,
+            export=True,
+            provider="CPUExecutionProvider"
+        )
+        model.save_pretrained(model_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+
+        quantizer = ORTQuantizer.from_pretrained(model)
+        quantizer.quantize(
+            save_dir=model_dir,
+            quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        )
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np"
+        )
+        inputs = {name: value.astype(np.int64) for name, value in encoded.items() if name in self.input_names}
+        last_hidden_state = self.session.run(None, inputs)[0]
+
+        # Mean pooling over non-padding tokens, matching sentence-transformers.
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        vectors = (last_hidden_state * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if self.normalize_embeddings:
+            vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors.astype(np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = [
+            self._encode(texts[start:start + self.batch_size])
+            for start in range(0, len(texts), self.batch_size)
+        ]
+        if not vectors:
+            return []
+        return np.concatenate(vectors).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class CachedEmbeddings(Embeddings):
+    """Wraps an Embeddings backend with an on-disk SQLite cache keyed by model and text hash."""
+
+    def __init__(self, embeddings: Embeddings, cache_path: str, namespace: str):
+
+        self.embeddings = embeddings
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.sha256((self.namespace + text).encode("utf-8")).digest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+
+        with self._lock:
+            cached = {}
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                cached.update((key, np.frombuffer(vector, dtype=np.float32).tolist()) for key, vector in rows)
+
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        if missing:
+            vectors = self.embeddings.embed_documents([texts[i] for i in missing])
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(keys[i], np.asarray(vector, dtype=np.float32).tobytes()) for i, vector in zip(missing, vectors)]
+                )
+                self._conn.commit()
+            cached.update((keys[i], list(vector)) for i, vector in zip(missing, vectors))
+
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
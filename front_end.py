@@ -1,16 +1,55 @@
+import uuid
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 
 API_BASE = "http://localhost:8000"
 
+# Must match STREAM_ERROR_MARKER in lanchain_chotbot.py.
+STREAM_ERROR_MARKER = "\x1e"
+
+
+@st.cache_resource
+def get_http_session():
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return session
+
+
+def stream_answer(response, errors):
+    # Yield answer text until the backend signals an error mid-stream.
+    chunks = response.iter_content(chunk_size=None, decode_unicode=True)
+    for chunk in chunks:
+        if STREAM_ERROR_MARKER in chunk:
+            text, _, error = chunk.partition(STREAM_ERROR_MARKER)
+            if text:
+                yield text
+            errors.append(error + "".join(chunks))
+            return
+        yield chunk
+
+
+@st.cache_data(ttl=30)
+def get_health():
+    return get_http_session().get(f"{API_BASE}/health").json()
+
+
 st.set_page_config(page_title="RAG Chatbot", layout="centered")
 
+session = get_http_session()
+
+# The HTTP session is shared across browser tabs; the backend session id is per tab.
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+session_headers = {"X-Session-Id": st.session_state.session_id}
+
 st.title("📄 RAG PDF Chatbot")
 
 
 
 try:
-    health = requests.get(f"{API_BASE}/health").json()
+    health = get_health()
     st.success("Backend Connected")
 except:
     st.error("Backend not running")
@@ -33,7 +72,7 @@ if uploaded_file:
         }
 
         with st.spinner("Processing PDF..."):
-            response = requests.post(f"{API_BASE}/upload-pdf", files=files)
+            response = session.post(f"{API_BASE}/upload-pdf", files=files, headers=session_headers)
 
         if response.status_code == 200:
             st.success(response.json()["message"])
@@ -55,13 +94,14 @@ if st.button("Ask"):
     }
 
     with st.spinner("Thinking..."):
-        response = requests.post(f"{API_BASE}/ask", json=payload)
+        response = session.post(f"{API_BASE}/ask", json=payload, headers=session_headers, stream=True)
 
     if response.status_code == 200:
-        data = response.json()
-
         st.subheader("Answer:")
-        st.write(data["answer"])
+        errors = []
+        st.write_stream(stream_answer(response, errors))
+        if errors:
+            st.error(errors[0])
 
     else:
         st.error(response.json()["detail"])
@@ -72,7 +112,7 @@ if st.button("Ask"):
 
 if st.button("Show Chat History"):
 
-    response = requests.get(f"{API_BASE}/chat-history")
+    response = session.get(f"{API_BASE}/chat-history", headers=session_headers)
 
     if response.status_code == 200:
         history = response.json()["chat_history"]
@@ -82,6 +122,8 @@ if st.button("Show Chat History"):
         for msg in history:
             if msg["type"] == "human":
                 st.markdown(f"**You:** {msg['content']}")
+            elif msg["type"] == "system":
+                st.caption(msg["content"])
             else:
                 st.markdown(f"**Bot:** {msg['content']}")
 
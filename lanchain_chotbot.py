@@ -1,49 +1,322 @@
 
+import asyncio
+import gc
+import hashlib
+import logging
 import os
+import pickle
+import re
 import shutil
-from typing import Optional, Dict, Any, List
-from langchain_community.document_loaders import PyPDFLoader
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, AsyncIterator
+import faiss
+import numpy as np
+import requests
+import torch
+from cachetools import LRUCache
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_ollama import OllamaLLM
 from langchain_community.chat_message_histories import ChatMessageHistory
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import BaseMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from sentence_transformers import CrossEncoder
+from embeddings import CachedEmbeddings, ONNXEmbeddings
+
+
+logger = logging.getLogger(__name__)
+
+# Streamed answers are plain text; an error after the 200 status line is sent
+# as this record-separator character followed by the message.
+STREAM_ERROR_MARKER = "\x1e"
+
+DEFAULT_LLM_MODEL = "llama3.2:3b-instruct-q4_K_M"
+DEFAULT_OLLAMA_BASE_URL = "http://localhost:11434"
+
+torch.set_num_threads(os.cpu_count() or 1)
+
+
+def ollama_keep_alive(model: str, base_url: str, keep_alive: Any = None):
+    # An empty-prompt generate request only loads or unloads the model.
+    payload = {"model": model}
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+    
+    response = requests.post(
+        f"{base_url}/api/generate",
+        json=payload,
+        timeout=60
+    )
+    response.raise_for_status()
+
+
+def unload_ollama_model(model: str = DEFAULT_LLM_MODEL, base_url: str = DEFAULT_OLLAMA_BASE_URL) -> Dict[str, Any]:
+
+    # The Ollama model is shared by every session, so only process shutdown should unload it.
+    try:
+        ollama_keep_alive(model, base_url, keep_alive=0)
+        return {
+            "status": "success",
+            "message": "Ollama model unloaded successfully"
+        }
+    except Exception as e:
+        return {
+            "status": "warning",
+            "message": f"Could not unload the Ollama model: {str(e)}"
+        }
+
+
+def build_embeddings(
+    cache_dir: str,
+    embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2",
+    embedding_backend: str = "onnx",
+    embed_batch_size: int = 128,
+    num_threads: Optional[int] = None
+) -> CachedEmbeddings:
+
+    if embedding_backend == "onnx":
+        base_embeddings = ONNXEmbeddings(
+            model_name=embedding_model,
+            batch_size=embed_batch_size,
+            num_threads=num_threads
+        )
+    else:
+        # torch's intra-op pool is process-wide, so this applies to every torch model in the process.
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        base_embeddings = HuggingFaceEmbeddings(
+            model_name=embedding_model,
+            encode_kwargs={"batch_size": embed_batch_size, "normalize_embeddings": True}
+        )
+    return CachedEmbeddings(
+        base_embeddings,
+        cache_path=os.path.join(cache_dir, "embeddings.sqlite"),
+        namespace=f"{embedding_backend}:{embedding_model}"
+    )
+
+
+class SummarizingChatMessageHistory(ChatMessageHistory):
+    """Keeps recent turns verbatim within a turn and character budget and folds older turns into a running summary."""
+    
+    llm: Any = None
+    max_turns: int = 10
+    max_chars: int = 4000
+    summary: str = ""
+    
+    def _recent_start(self, max_turns: int, max_chars: int) -> int:
+        # Index of the first message of the longest run of whole recent turns fitting both budgets.
+        start = len(self.messages)
+        turns = 0
+        chars = 0
+        while start >= 2 and turns < max_turns:
+            turn_chars = sum(len(msg.content) for msg in self.messages[start - 2:start])
+            if chars + turn_chars > max_chars:
+                break
+            start -= 2
+            turns += 1
+            chars += turn_chars
+        return start
+    
+    def needs_compaction(self) -> bool:
+        return self._recent_start(self.max_turns, self.max_chars) > 0
+    
+    def compact(self):
+        # Evict down to half of each budget so the LLM summarizes once every
+        # few turns instead of on every turn past the limit.
+        messages = self.messages
+        cut = self._recent_start(max(self.max_turns // 2, 1), self.max_chars // 2)
+        if cut == 0:
+            return
+        
+        summary = self._summarize(messages[:cut])
+        # New turns are only appended, so the evicted head is unchanged unless the history was cleared meanwhile.
+        if summary is not None and self.messages is messages:
+            del messages[:cut]
+            self.summary = summary
+    
+    def _summarize(self, evicted: List[BaseMessage]) -> Optional[str]:
+        transcript = "\n".join(f"{msg.type}: {msg.content}" for msg in evicted)
+        prompt = (
+            "Summarize the following conversation concisely, keeping any facts "
+            "needed to answer follow-up questions.\n\n"
+            f"Previous summary: {self.summary or 'None'}\n\n"
+            f"New messages:\n{transcript}\n\nSummary:"
+        )
+        try:
+            return self.llm.invoke(prompt).strip()
+        except Exception as e:
+            logger.warning("Could not summarize chat history: %s", e)
+            return None
+    
+    def prompt_messages(self) -> List[BaseMessage]:
+        # Turns that no longer fit are left out even before compaction has
+        # summarized them, so the prompt stays within num_ctx.
+        recent = self.messages[self._recent_start(self.max_turns, self.max_chars):]
+        if not self.summary:
+            return recent
+        return [SystemMessage(content=f"Summary of the earlier conversation: {self.summary}")] + recent
+    
+    def clear(self) -> None:
+        super().clear()
+        self.summary = ""
 
 
 class RAGServiceModern:
     
-    def __init__(self, vector_db_path: str = "vector_db", embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    EMBED_CACHE_DIR = "embed_cache"
+    HASH_FILE = "hash.txt"
+    
+    def __init__(
+        self,
+        vector_db_path: str = "vector_db",
+        embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2",
+        index_factory: str = "IVF100,PQ8",
+        nprobe: int = 8,
+        min_ann_vectors: int = 10_000,
+        embed_batch_size: int = 128,
+        embedding_backend: str = "onnx",
+        mmap: bool = False,
+        chunk_size: int = 500,
+        chunk_overlap: int = 75,
+        cache_size: int = 512,
+        llm_model: str = DEFAULT_LLM_MODEL,
+        num_ctx: int = 2048,
+        num_thread: Optional[int] = None,
+        num_predict: int = 256,
+        temperature: float = 0.0,
+        rerank_model: Optional[str] = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        fetch_k: int = 10,
+        top_k: int = 3,
+        ollama_base_url: str = DEFAULT_OLLAMA_BASE_URL,
+        max_history_turns: int = 10,
+        max_history_chars: int = 4000,
+        keep_alive: str = "30m",
+        embed_workers: int = 1,
+        embeddings: Optional[Embeddings] = None,
+        reranker: Optional[CrossEncoder] = None
+    ):
 
         self.vector_db_path = vector_db_path
-        self.embedding_model = HuggingFaceEmbeddings(model_name=embedding_model)
-        self.llm = OllamaLLM(model="llama2")
+        self.index_factory = index_factory
+        self.nprobe = nprobe
+        self.min_ann_vectors = min_ann_vectors
+        # faiss only memory-maps IVF inverted lists; flat/SQ indexes are read into RAM regardless.
+        self.mmap = mmap
+        self.embed_batch_size = embed_batch_size
+        self.embed_workers = max(embed_workers, 1)
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len
+        )
+        # Callers serving many sessions pass shared models so each session
+        # does not load its own copy of the weights; they should build them
+        # with num_threads matching embed_workers as done here.
+        self.embedding_model = embeddings or build_embeddings(
+            os.path.join(self.vector_db_path, self.EMBED_CACHE_DIR),
+            embedding_model=embedding_model,
+            embedding_backend=embedding_backend,
+            embed_batch_size=embed_batch_size,
+            num_threads=max(1, (os.cpu_count() or 1) // self.embed_workers)
+        )
+        self.llm_model = llm_model
+        self.ollama_base_url = ollama_base_url
+        self.keep_alive = keep_alive
+        self.llm = OllamaLLM(
+            model=llm_model,
+            base_url=ollama_base_url,
+            keep_alive=keep_alive,
+            num_ctx=num_ctx,
+            num_thread=num_thread or os.cpu_count(),
+            num_predict=num_predict,
+            temperature=temperature
+        )
+        if reranker is None and rerank_model:
+            reranker = CrossEncoder(rerank_model)
+        self.reranker = reranker
+        self.fetch_k = fetch_k
+        self.top_k = top_k
         self.vectorstore: Optional[FAISS] = None
         self.retriever = None
-        self.chat_history = ChatMessageHistory()
+        # About 1k tokens of history leaves room in num_ctx=2048 for the system
+        # prompt, top_k context chunks and a num_predict-sized answer.
+        self.chat_history = SummarizingChatMessageHistory(
+            llm=self.llm,
+            max_turns=max_history_turns,
+            max_chars=max_history_chars
+        )
+        self._compaction_lock = threading.Lock()
         self.rag_chain = None
+        self.answer_chain = None
+        self._cache_lock = threading.Lock()
+        self._retrieval_cache: LRUCache = LRUCache(maxsize=cache_size)
         
         if not os.path.exists(self.vector_db_path):
             os.makedirs(self.vector_db_path)
+        
+        instruction_sets = getattr(faiss, "supported_instruction_sets", lambda: set())()
+        logger.info("FAISS SIMD instruction sets: %s", ", ".join(sorted(instruction_sets)) or "none detected")
     
-    def process_pdf(self, pdf_path: str) -> Dict[str, Any]:
+    def process_pdf(self, pdf_path: str, file_hash: Optional[str] = None) -> Dict[str, Any]:
 
         try:
-            loader = PyPDFLoader(pdf_path)
+            hash_path = os.path.join(self.vector_db_path, self.HASH_FILE)
+            if file_hash and os.path.exists(os.path.join(self.vector_db_path, "index.faiss")) and os.path.exists(hash_path):
+                with open(hash_path, "r") as f:
+                    indexed_hash = f.read().strip()
+                if indexed_hash == self._index_signature(file_hash):
+                    result = self.load_existing_vectorstore()
+                    if result["status"] == "success":
+                        return {
+                            "status": "success",
+                            "message": "PDF unchanged since last upload. Reused existing index.",
+                            "num_chunks": self.vectorstore.index.ntotal,
+                            "reused_index": True
+                        }
+            
+            # Drop the stale hash first so a failed rebuild is never mistaken for a match.
+            if os.path.exists(hash_path):
+                os.remove(hash_path)
+            
+            loader = PyMuPDFLoader(pdf_path)
             documents = loader.load()
+            chunks = self.text_splitter.split_documents(documents)
+            
+            if not chunks:
+                return {
+                    "status": "error",
+                    "message": "No extractable text found in the PDF. Scanned PDFs need OCR before they can be indexed."
+                }
             
-            self.vectorstore = FAISS.from_documents(documents, self.embedding_model)
+            self.vectorstore = self._build_vectorstore(chunks)
             self.vectorstore.save_local(self.vector_db_path)
+            if file_hash:
+                with open(hash_path, "w") as f:
+                    f.write(self._index_signature(file_hash))
             
-            self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": 3})
+            if self.mmap and self._is_ivf(self.vectorstore.index):
+                # Swap the freshly built in-RAM index for a page-cached view of the saved file.
+                self.vectorstore = self._load_vectorstore()
+            
+            self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": self.fetch_k})
             
             self._create_rag_chain()
             
             return {
                 "status": "success",
-                "message": f"PDF processed successfully. Loaded {len(documents)} pages.",
-                "num_documents": len(documents)
+                "message": f"PDF processed successfully. Loaded {len(documents)} pages into {len(chunks)} chunks.",
+                "num_documents": len(documents),
+                "num_chunks": len(chunks)
             }
         except Exception as e:
             return {
@@ -51,7 +324,143 @@ class RAGServiceModern:
                 "message": f"Error processing PDF: {str(e)}"
             }
     
+    def _index_signature(self, file_hash: str) -> str:
+        # A persisted index is only reusable if it was built from the same bytes with the same settings.
+        namespace = getattr(self.embedding_model, "namespace", type(self.embedding_model).__name__)
+        config = "|".join(str(value) for value in (
+            namespace,
+            self.chunk_size,
+            self.chunk_overlap,
+            self.index_factory,
+            self.min_ann_vectors
+        ))
+        return f"{file_hash}:{hashlib.blake2b(config.encode('utf-8')).hexdigest()}"
+    
+    def _build_index(self, xb: np.ndarray) -> faiss.Index:
+        d = xb.shape[1]
+        
+        # IVF needs enough vectors to train its coarse quantizer; small corpora
+        # are cheaper to scan exhaustively anyway, stored as fp16 to halve memory.
+        if len(xb) < self.min_ann_vectors:
+            index = faiss.IndexScalarQuantizer(d, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2)
+        else:
+            index = faiss.index_factory(d, self.index_factory)
+            index.train(xb)
+            self._set_nprobe(index)
+        
+        index.add(xb)
+        return index
+    
+    def _embed_documents(self, texts: List[str]) -> np.ndarray:
+        # Each embed_documents call lets the backend encode in batches of
+        # embed_batch_size. The backend's intra-op threads are set to
+        # cpu_count / embed_workers, so shards split the cores rather than
+        # oversubscribing them.
+        num_batches = -(-len(texts) // self.embed_batch_size)
+        num_shards = min(self.embed_workers, num_batches)
+        if num_shards <= 1:
+            return np.asarray(self.embedding_model.embed_documents(texts), dtype="float32")
+        
+        shard_size = -(-num_batches // num_shards) * self.embed_batch_size
+        shards = [texts[start:start + shard_size] for start in range(0, len(texts), shard_size)]
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            vectors = list(executor.map(self.embedding_model.embed_documents, shards))
+        
+        return np.concatenate([np.asarray(v, dtype="float32") for v in vectors])
+    
+    def _build_vectorstore(self, documents: List[Any]) -> FAISS:
+        texts = [doc.page_content for doc in documents]
+        xb = self._embed_documents(texts)
+        
+        index = self._build_index(xb)
+        
+        ids = [str(uuid.uuid4()) for _ in documents]
+        docstore = InMemoryDocstore(dict(zip(ids, documents)))
+        index_to_docstore_id = dict(enumerate(ids))
+        
+        return FAISS(
+            embedding_function=self.embedding_model,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id
+        )
+    
+    @staticmethod
+    def _is_ivf(index: faiss.Index) -> bool:
+        return faiss.try_extract_index_ivf(index) is not None
+    
+    def _set_nprobe(self, index: faiss.Index):
+        # Reach through wrappers such as the IndexPreTransform built for "OPQ16,IVF..." or "PCA64,IVF...".
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            ivf.nprobe = self.nprobe
+    
+    def _load_vectorstore(self) -> FAISS:
+        if not self.mmap:
+            vectorstore = FAISS.load_local(
+                self.vector_db_path, 
+                self.embedding_model,
+                allow_dangerous_deserialization=True
+            )
+        else:
+            index = faiss.read_index(
+                os.path.join(self.vector_db_path, "index.faiss"),
+                faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+            )
+            if not self._is_ivf(index):
+                logger.info("mmap requested but %s is not an IVF index; it was loaded into RAM", type(index).__name__)
+            with open(os.path.join(self.vector_db_path, "index.pkl"), "rb") as f:
+                docstore, index_to_docstore_id = pickle.load(f)
+            
+            vectorstore = FAISS(
+                embedding_function=self.embedding_model,
+                index=index,
+                docstore=docstore,
+                index_to_docstore_id=index_to_docstore_id
+            )
+        
+        # nprobe is a search-time parameter and is not persisted with the index.
+        self._set_nprobe(vectorstore.index)
+        return vectorstore
+    
+    @staticmethod
+    def _normalize_question(question: str) -> str:
+        return " ".join(re.sub(r"[^\w\s]", " ", question.lower()).split())
+    
+    def _reset_caches(self):
+        with self._cache_lock:
+            self._retrieval_cache.clear()
+    
+    def _rerank(self, question: str, docs: List[Any]) -> List[Any]:
+        # Over-fetch from FAISS, then keep only the chunks the cross-encoder
+        # scores highest so the prompt carries top_k chunks instead of fetch_k.
+        if self.reranker is None or len(docs) <= self.top_k:
+            return docs[:self.top_k]
+        
+        scores = self.reranker.predict([(question, doc.page_content) for doc in docs])
+        ranked = sorted(zip(scores, docs), key=lambda pair: pair[0], reverse=True)
+        return [doc for _, doc in ranked[:self.top_k]]
+    
+    def _retrieve(self, question: str) -> List[Any]:
+        key = self._normalize_question(question)
+        with self._cache_lock:
+            docs = self._retrieval_cache.get(key)
+        if docs is not None:
+            return docs
+        
+        docs = self._rerank(question, self.retriever.invoke(question))
+        with self._cache_lock:
+            self._retrieval_cache[key] = docs
+        return docs
+    
+    @staticmethod
+    def _format_docs(docs: List[Any]) -> str:
+        return "\n\n".join(doc.page_content for doc in docs)
+    
     def _create_rag_chain(self):
+        # Cached results belong to the previous retriever.
+        self._reset_caches()
+        
         if not self.retriever:
             return
         
@@ -65,18 +474,15 @@ Context: {context}"""),
             ("human", "{question}")
         ])
         
-        def format_docs(docs):
-            return "\n\n".join(doc.page_content for doc in docs)
+        self.answer_chain = prompt | self.llm | StrOutputParser()
         
         self.rag_chain = (
             {
-                "context": self.retriever | format_docs,
+                "context": RunnableLambda(self._retrieve) | self._format_docs,
                 "question": RunnablePassthrough(),
-                "chat_history": lambda x: self.chat_history.messages
+                "chat_history": lambda x: self.chat_history.prompt_messages()
             }
-            | prompt
-            | self.llm
-            | StrOutputParser()
+            | self.answer_chain
         )
     
     def load_existing_vectorstore(self) -> Dict[str, Any]:
@@ -88,12 +494,8 @@ Context: {context}"""),
                     "message": "No existing vector store found"
                 }
             
-            self.vectorstore = FAISS.load_local(
-                self.vector_db_path, 
-                self.embedding_model,
-                allow_dangerous_deserialization=True
-            )
-            self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": 3})
+            self.vectorstore = self._load_vectorstore()
+            self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": self.fetch_k})
             
             self._create_rag_chain()
             
@@ -107,6 +509,21 @@ Context: {context}"""),
                 "message": f"Error loading vector store: {str(e)}"
             }
     
+    def _record_turn(self, question: str, answer: str):
+        self.chat_history.add_user_message(question)
+        self.chat_history.add_ai_message(answer)
+    
+    def compact_history(self):
+        # Summarization is a full LLM call, so callers run this after the answer has been delivered.
+        if not self.chat_history.needs_compaction():
+            return
+        if not self._compaction_lock.acquire(blocking=False):
+            return
+        try:
+            self.chat_history.compact()
+        finally:
+            self._compaction_lock.release()
+    
     def ask_question(self, question: str) -> Dict[str, Any]:
 
         if self.rag_chain is None:
@@ -118,8 +535,8 @@ Context: {context}"""),
         try:
             answer = self.rag_chain.invoke(question)
             
-            self.chat_history.add_user_message(question)
-            self.chat_history.add_ai_message(answer)
+            self._record_turn(question, answer)
+            self.compact_history()
             
             return {
                 "status": "success",
@@ -132,11 +549,50 @@ Context: {context}"""),
                 "message": f"Error processing question: {str(e)}"
             }
     
+    async def astream_question(self, question: str) -> AsyncIterator[str]:
+
+        if self.rag_chain is None:
+            yield f"{STREAM_ERROR_MARKER}Please upload and process a PDF first"
+            return
+        
+        chunks = []
+        try:
+            # Retrieval and model loading are independent, so let Ollama
+            # load the model while the question is embedded and searched.
+            docs, _ = await asyncio.gather(
+                asyncio.to_thread(self._retrieve, question),
+                self._awarm_llm()
+            )
+            inputs = {
+                "context": self._format_docs(docs),
+                "question": question,
+                "chat_history": self.chat_history.prompt_messages()
+            }
+            async for chunk in self.answer_chain.astream(inputs):
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            logger.exception(
+                "Error streaming answer after %d chunks; partial answer discarded",
+                len(chunks)
+            )
+            yield f"{STREAM_ERROR_MARKER}Error processing question: {str(e)}"
+            return
+        
+        self._record_turn(question, "".join(chunks))
+    
     def get_chat_history(self) -> List[Dict[str, str]]:
 
         chat_history = []
         messages = self.chat_history.messages
         
+        # Older turns live on only in the summary once they have been compacted.
+        if self.chat_history.summary:
+            chat_history.append({
+                "type": "system",
+                "content": f"Summary of the earlier conversation: {self.chat_history.summary}"
+            })
+        
         for msg in messages:
             chat_history.append({
                 "type": msg.type,
@@ -149,13 +605,18 @@ Context: {context}"""),
         try:
             self.chat_history.clear()
             
-            self.retriever = None
-            self.vectorstore = None
-            self.rag_chain = None
+            self.release_resources()
             
+            # The embedding cache is keyed by model and text, so it stays valid across sessions.
             if os.path.exists(self.vector_db_path):
-                shutil.rmtree(self.vector_db_path)
-                os.makedirs(self.vector_db_path)
+                for entry in os.listdir(self.vector_db_path):
+                    if entry == self.EMBED_CACHE_DIR:
+                        continue
+                    entry_path = os.path.join(self.vector_db_path, entry)
+                    if os.path.isdir(entry_path):
+                        shutil.rmtree(entry_path)
+                    else:
+                        os.remove(entry_path)
             
             return {
                 "status": "success",
@@ -167,6 +628,51 @@ Context: {context}"""),
                 "message": f"Error clearing session: {str(e)}"
             }
     
+    def _ollama_keep_alive(self, keep_alive: Any = None):
+        ollama_keep_alive(self.llm_model, self.ollama_base_url, keep_alive)
+    
+    async def _awarm_llm(self):
+        try:
+            await asyncio.to_thread(self._ollama_keep_alive, self.keep_alive)
+        except Exception as e:
+            logger.warning("Could not warm up Ollama model %s: %s", self.llm_model, e)
+    
+    def warmup(self) -> Dict[str, Any]:
+
+        try:
+            self.embedding_model.embed_query("warmup")
+            if self.reranker is not None:
+                self.reranker.predict([("warmup", "warmup")])
+            
+            self._ollama_keep_alive(self.keep_alive)
+            
+            return {
+                "status": "success",
+                "message": "Models warmed up successfully"
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Error warming up models: {str(e)}"
+            }
+    
+    def release_resources(self) -> Dict[str, Any]:
+
+        self.retriever = None
+        self.vectorstore = None
+        self.rag_chain = None
+        self.answer_chain = None
+        self._reset_caches()
+        
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        
+        return {
+            "status": "success",
+            "message": "Resources released successfully"
+        }
+    
     def delete_pdf(self, pdf_path: str) -> Dict[str, Any]:
 
         try:
@@ -192,7 +698,8 @@ Context: {context}"""),
             "vectorstore_loaded": self.vectorstore is not None,
             "retriever_ready": self.retriever is not None,
             "qa_chain_ready": self.rag_chain is not None,
-            "chat_history_length": len(self.chat_history.messages)
+            "chat_history_length": len(self.chat_history.messages),
+            "cache_hits": getattr(self.embedding_model, "hits", 0)
         }
         
         